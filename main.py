@@ -12,20 +12,53 @@ limitations under the License.
 '''
 
 import argparse
+import heapq
+import json
 import os
 import re
-from datetime import timedelta, datetime
+import sys
+import stat
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, datetime, timezone
 
 import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 from kubernetes import config, client
 
 REGION = None
 DRYRUN = None
 IMAGES_TO_KEEP = 300
 IMAGES_KEEP_DURATION = "3m"
+IMAGES_KEEP_TIMEDELTA = None
 IGNORE_TAGS_REGEX = None
 IGNORE_REPO_REGEX = None
+IGNORE_TAGS_RE = None
+IGNORE_REPO_RE = None
 CLUSTERS = []
+RUNNING_CACHE_TTL = 0
+RUNNING_CACHE_PATH = "/tmp/running_images.json"
+REGION_WORKERS = 8
+REPOSITORY_WORKERS = 16
+# BatchDeleteImage accepts at most 100 image ids per call
+DELETE_BATCH_SIZE = 100
+DELETE_WORKERS = 8
+POD_PAGE_SIZE = 500
+# One ECR client is shared by all workers of a region: size its connection pool for them
+# and back off adaptively when ECR throttles the concurrent calls
+ECR_CLIENT_CONFIG = Config(max_pool_connections=REPOSITORY_WORKERS + DELETE_WORKERS, retries={'mode': 'adaptive'})
+
+# Duration unit -> number of days, "m" stands for months
+DURATION_UNITS = {
+    'd': 1, 'day': 1, 'days': 1,
+    'w': 7, 'week': 7, 'weeks': 7,
+    'm': 30, 'month': 30, 'months': 30,
+    'y': 365, 'year': 365, 'years': 365,
+}
+_DURATION_RE = re.compile(r'(\d+)\s*([a-z]+)')
 
 
 def initialize():
@@ -34,12 +67,18 @@ def initialize():
     global IMAGES_TO_KEEP
     global IGNORE_TAGS_REGEX
     global IGNORE_REPO_REGEX
+    global IGNORE_TAGS_RE
+    global IGNORE_REPO_RE
     global CLUSTERS
     global IMAGES_KEEP_DURATION
+    global IMAGES_KEEP_TIMEDELTA
+    global RUNNING_CACHE_TTL
 
     REGION = os.environ.get('REGION', "None")
     DRYRUN = os.environ.get('DRYRUN', "false").lower()
     IMAGES_KEEP_DURATION = os.environ.get('IMAGES_KEEP_DURATION', "3m")
+    # Parse the duration before any API call, so an invalid value fails before anything is deleted
+    IMAGES_KEEP_TIMEDELTA = convert_duration_to_timedelta(IMAGES_KEEP_DURATION)
     CLUSTERS = os.environ.get('CLUSTERS', "None").split(",")
     if DRYRUN == "false":
         DRYRUN = False
@@ -48,157 +87,286 @@ def initialize():
     IMAGES_TO_KEEP = int(os.environ.get('IMAGES_TO_KEEP', 100))
     IGNORE_TAGS_REGEX = os.environ.get('IGNORE_TAGS_REGEX', "^$")
     IGNORE_REPO_REGEX = os.environ.get('IGNORE_REPO_REGEX', "^$")
+    IGNORE_TAGS_RE = re.compile(IGNORE_TAGS_REGEX)
+    IGNORE_REPO_RE = re.compile(IGNORE_REPO_REGEX)
+    # The running images cache is meant for warm Lambda invocations, anywhere else it has to be enabled explicitly
+    RUNNING_CACHE_TTL = int(os.environ.get('RUNNING_CACHE_TTL', 60 if 'AWS_LAMBDA_FUNCTION_NAME' in os.environ else 0))
 
 
 def handler(event, context):
     initialize()
+    # Running pods do not depend on the ECR region, discover them only once
+    running_tags = get_running_tags(get_cached_running_images(CLUSTERS))
     if REGION == "None":
         ec2_client = boto3.client('ec2')
         available_regions = ec2_client.describe_regions()['Regions']
-        for region in available_regions:
-            discover_delete_images(region['RegionName'], CLUSTERS)
+        # Regions are independent of each other, scan them concurrently
+        with ThreadPoolExecutor(max_workers=min(REGION_WORKERS, len(available_regions))) as executor:
+            list(executor.map(lambda region: discover_delete_images(region['RegionName'], running_tags),
+                              available_regions))
     else:
-        discover_delete_images(REGION, CLUSTERS)
+        discover_delete_images(REGION, running_tags)
 
 
 def convert_duration_to_timedelta(duration_str):
-    number = int(re.search(r'\d+', duration_str).group())
-    if 'd' in duration_str:
-        return timedelta(days=number)
-    elif 'w' in duration_str:
-        return timedelta(weeks=number)
-    elif 'm' in duration_str:
-        return timedelta(days=number * 30)
-    else:
+    # Accepts "3m", "3 m", "90days" or "6 Weeks"
+    match = _DURATION_RE.fullmatch(duration_str.strip().lower())
+    if match is None or match[2] not in DURATION_UNITS:
         raise ValueError(f'Invalid duration string: {duration_str}')
+    return timedelta(days=int(match[1]) * DURATION_UNITS[match[2]])
 
 
 def get_eks_pods_images(cluster):
-    config.load_kube_config(context=cluster)
-    v1 = client.CoreV1Api()
-    pods = v1.list_pod_for_all_namespaces().items
-    running_images = []
-    for pod in pods:
-        for container in pod.spec.containers:
-            if container.image not in running_images:
-                running_images.append(container.image)
-    return running_images
-
-
-def discover_delete_images(region_name, clusters):
-    global time_limit
-    print("Discovering images in " + region_name)
-    ecr_client = boto3.client('ecr', region_name=region_name)
+    print(f'Discovering running pods in {cluster}')
+    # load_kube_config mutates the global kubernetes configuration, use a dedicated api client per cluster instead
+    v1 = client.CoreV1Api(api_client=config.new_client_from_config(context=cluster))
+    # Only container images are needed, read the raw response instead of building full V1Pod models.
+    # resource_version='0' lets the apiserver answer from its watch cache instead of a quorum read from etcd.
+    # The result may lag by a few seconds, which is fine for image retention decisions.
+    # limit/_continue pages the listing when the apiserver honours it. When the list is served from the watch cache
+    # (resource_version='0') limit is usually ignored and the whole list comes back in one response.
+    # The apiserver rejects resource_version together with a continue token, so it is sent only on the first page.
+    running_images = set()
+    list_kwargs = {'resource_version': '0'}
+    while True:
+        response = v1.list_pod_for_all_namespaces(limit=POD_PAGE_SIZE, _preload_content=False, **list_kwargs)
+        data = json.loads(response.data)
+        running_images.update(container['image'] for pod in data['items'] for container in pod['spec']['containers'])
+        continue_token = data['metadata'].get('continue')
+        if not continue_token:
+            return running_images
+        list_kwargs = {'_continue': continue_token}
+
+
+def get_running_images(clusters):
+    # Clusters are independent of each other, list their pods concurrently
+    running_containers_set = set()
+    with ThreadPoolExecutor(max_workers=len(clusters)) as executor:
+        for running_images in executor.map(get_eks_pods_images, clusters):
+            running_containers_set.update(running_images)
 
-    repositories = []
+    print("Images that are running:")
+    for image in running_containers_set:
+        print(image)
+    return running_containers_set
+
+
+def get_cached_running_images(clusters):
+    # Running images rarely change between frequent runs, reuse them from /tmp (kept across warm Lambda invocations)
+    if RUNNING_CACHE_TTL > 0:
+        try:
+            # Do not follow symlinks, the path is in a directory shared with other users
+            with os.fdopen(os.open(RUNNING_CACHE_PATH, os.O_RDONLY | os.O_NOFOLLOW)) as cache_file:
+                cache_stat = os.fstat(cache_file.fileno())
+                # Only trust a regular file owned by us that nobody else can write
+                if (stat.S_ISREG(cache_stat.st_mode) and cache_stat.st_uid == os.getuid()
+                        and not cache_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+                        and time.time() - cache_stat.st_mtime < RUNNING_CACHE_TTL):
+                    cache = json.load(cache_file)
+                    if cache['clusters'] == clusters:
+                        print("Using cached running images from " + RUNNING_CACHE_PATH)
+                        return set(cache['images'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    running_containers_set = get_running_images(clusters)
+
+    if RUNNING_CACHE_TTL > 0:
+        try:
+            # Write to a private temporary file first so a concurrent run never reads a partial cache
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(RUNNING_CACHE_PATH), prefix='.running_images.')
+            try:
+                with os.fdopen(fd, 'w') as cache_file:
+                    json.dump({'clusters': clusters, 'images': sorted(running_containers_set)}, cache_file)
+                os.replace(tmp_path, RUNNING_CACHE_PATH)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print("Unable to write running images cache: {}".format(e))
+    return running_containers_set
+
+
+def get_running_tags(running_images):
+    # Index running images as repository URI -> tags, so each repository is matched with a single lookup
+    running_tags = {}
+    for image in running_images:
+        repository_uri, separator, tag = image.rpartition(':')
+        # Skip images without a tag, e.g. "registry:5000/name" or digest references
+        if separator and '/' not in tag and '@' not in repository_uri:
+            running_tags.setdefault(repository_uri, set()).add(tag)
+    return running_tags
+
+
+def get_ecr_client(region_name):
+    # boto3 default session is not thread-safe, create the region client from a dedicated session.
+    # The client itself is thread-safe and is shared by all workers of the region.
+    return boto3.session.Session().client('ecr', region_name=region_name, config=ECR_CLIENT_CONFIG)
+
+
+def iter_repositories(ecr_client):
+    # Ignored repositories are dropped while paginating, so they are never held in memory
+    check_ignored = IGNORE_REPO_REGEX != "^$"
     describe_repo_paginator = ecr_client.get_paginator('describe_repositories')
     for response_listrepopaginator in describe_repo_paginator.paginate():
         for repo in response_listrepopaginator['repositories']:
-            repositories.append(repo)
-
-    running_containers = []
-    for cluster in clusters:
-        print(f'Discovering running pods in {cluster}')
-        running_containers.extend(get_eks_pods_images(cluster))
-
-    print("Images that are running:")
-    for image in running_containers:
-        print(image)
+            if check_ignored and IGNORE_REPO_RE.search(repo['repositoryUri']):
+                print("------------------------")
+                print("Skipping repository: " + repo['repositoryUri'])
+                continue
+            # Keep only the fields used to process the repository
+            yield {'registryId': repo['registryId'],
+                   'repositoryName': repo['repositoryName'],
+                   'repositoryUri': repo['repositoryUri']}
 
-    ignore_repo_regex = re.compile(IGNORE_REPO_REGEX)
-
-    for repository in repositories:
-        if re.search(ignore_repo_regex, repository['repositoryUri']):
-            print("------------------------")
-            print("Skipping repository: " + repository['repositoryUri'])
-            continue
 
+def discover_delete_images(region_name, running_tags):
+    print("Discovering images in " + region_name)
+    ecr_client = get_ecr_client(region_name)
+
+    # describe_images calls are independent per repository, run them concurrently while the next
+    # describe_repositories page is fetched. The number of queued repositories is bounded to cap memory.
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=REPOSITORY_WORKERS) as executor:
+        try:
+            for repository in iter_repositories(ecr_client):
+                pending.append((repository, executor.submit(process_repository, ecr_client, repository, running_tags)))
+                if len(pending) >= 2 * REPOSITORY_WORKERS:
+                    finish_repository(ecr_client, *pending.popleft())
+            while pending:
+                finish_repository(ecr_client, *pending.popleft())
+        except BaseException:
+            # Do not start queued repositories whose results would be thrown away
+            for _, future in pending:
+                future.cancel()
+            raise
+
+
+def finish_repository(ecr_client, repository, future):
+    try:
+        deletesha, deletetag, flushed_count = future.result()
+    except (BotoCoreError, ClientError) as e:
+        # An AWS error in one repository should not stop the cleanup of the others
         print("------------------------")
-        print("Starting with repository: " + repository['repositoryUri'])
-        deletesha = []
-        deletetag = []
-        tagged_images = []
-
-        describe_image_paginator = ecr_client.get_paginator('describe_images')
-        for response_describe_image_paginator in describe_image_paginator.paginate(
-                registryId=repository['registryId'],
-                repositoryName=repository['repositoryName']):
-            for image in response_describe_image_paginator['imageDetails']:
-                if 'imageTags' in image:
-                    tagged_images.append(image)
-                else:
-                    append_to_list(deletesha, image['imageDigest'])
-
-        print("Total number of images found: {}".format(len(tagged_images) + len(deletesha)))
-        print("Number of untagged images found {}".format(len(deletesha)))
-
-        tagged_images.sort(key=lambda k: k['imagePushedAt'], reverse=True)
-
-        # Get ImageDigest from ImageURL for running images. Do this for every repository
-        # Converting running_containers to set for efficient lookup
-        running_containers_set = set(running_containers)
-
-        running_sha = []
-
-        # Calculate abs point to check how old images are
-        keep_duration = convert_duration_to_timedelta(IMAGES_KEEP_DURATION)
-
-        for image in tagged_images:
-            time_limit = datetime.now(tz=image['imagePushedAt'].tzinfo) - keep_duration
-            for tag in image['imageTags']:
-                imageurl = repository['repositoryUri'] + ":" + tag
-                if imageurl in running_containers_set:  # This is a constant time operation
-                    running_sha.append(image['imageDigest'])
-
-        # Remove duplicates in running_sha
-        running_sha_set = set(running_sha)
-
-        print("Number of running images found {}".format(len(running_sha)))
-        ignore_tags_regex = re.compile(IGNORE_TAGS_REGEX)
-
-        for index, image in enumerate(tagged_images):
-            # lastRecordedPullTime is present only for active images.
-            last_activity_time = image.get('lastRecordedPullTime')
-
-            eligible_for_deletion = False
-            # stale image, we will decide based on number or push time
-            if last_activity_time is None:
-                if image['imagePushedAt'] < time_limit or index >= IMAGES_TO_KEEP:
-                    eligible_for_deletion = True
-            # active image, only by last pull
-            elif last_activity_time < time_limit:
-                eligible_for_deletion = True
-
-            if eligible_for_deletion:
-                for tag in image['imageTags']:
-                    if "latest" not in tag and ignore_tags_regex.search(tag) is None:
-                        if not running_sha_set or image['imageDigest'] not in running_sha_set:
-                            append_to_list(deletesha, image['imageDigest'])
-                            append_to_tag_list(deletetag, {"imageUrl": repository['repositoryUri'] + ":" + tag,
-                                                           "pushedAt": image["imagePushedAt"],
-                                                           "pulledAt": image.get('lastRecordedPullTime')})
-
-        if deletesha:
-            print("Number of images to be deleted: {}".format(len(deletesha)))
+        print("Failed to process repository {}: {}".format(repository['repositoryUri'], e))
+        return
+    print("------------------------")
+    print("Finished with repository: " + repository['repositoryUri'])
+    if deletesha or flushed_count:
+        # Untagged images flushed while paginating are part of the total as well
+        print("{}: number of images to be deleted: {}".format(repository['repositoryUri'],
+                                                              flushed_count + len(deletesha)))
+        try:
             delete_images(
                 ecr_client,
                 deletesha,
                 deletetag,
                 repository['registryId'],
-                repository['repositoryName']
+                repository['repositoryName'],
+                first_chunk=flushed_count // DELETE_BATCH_SIZE + 1
             )
-        else:
-            print("Nothing to delete in repository : " + repository['repositoryName'])
+        except (BotoCoreError, ClientError) as e:
+            print("Failed to delete images in repository {}: {}".format(repository['repositoryUri'], e))
+    else:
+        print("Nothing to delete in repository : " + repository['repositoryUri'])
+
+
+def process_repository(ecr_client, repository, running_tags):
+    print("Starting with repository: " + repository['repositoryUri'])
+    deletesha = []
+    deletetag = []
+    tagged_images = []
+    # Digests already queued for deletion, for constant time duplicate checks
+    seen_sha = set()
+    untagged_count = 0
+    # Number of untagged images already flushed to BatchDeleteImage while paginating
+    flushed_count = 0
+
+    # Untagged images are always deleted and need only their digest, list them with the lighter ListImages call
+    list_image_paginator = ecr_client.get_paginator('list_images')
+    for response_list_image_paginator in list_image_paginator.paginate(
+            registryId=repository['registryId'],
+            repositoryName=repository['repositoryName'],
+            filter={'tagStatus': 'UNTAGGED'}):
+        for image_id in response_list_image_paginator['imageIds']:
+            untagged_count += 1
+            digest = image_id['imageDigest']
+            if digest not in seen_sha:
+                seen_sha.add(digest)
+                deletesha.append({'imageDigest': digest})
+            # Flush them while paginating instead of buffering
+            if len(deletesha) >= DELETE_BATCH_SIZE:
+                delete_images(ecr_client, deletesha, [], repository['registryId'], repository['repositoryName'],
+                              first_chunk=flushed_count // DELETE_BATCH_SIZE + 1)
+                flushed_count += len(deletesha)
+                deletesha = []
+
+    describe_image_paginator = ecr_client.get_paginator('describe_images')
+    for response_describe_image_paginator in describe_image_paginator.paginate(
+            registryId=repository['registryId'],
+            repositoryName=repository['repositoryName'],
+            filter={'tagStatus': 'TAGGED'}):
+        for image in response_describe_image_paginator['imageDetails']:
+            # Keep only the fields used by the retention logic
+            tagged_images.append({'imageDigest': image['imageDigest'],
+                                  'imageTags': image['imageTags'],
+                                  'imagePushedAt': image['imagePushedAt'],
+                                  'lastRecordedPullTime': image.get('lastRecordedPullTime')})
+
+    print("{}: total number of images found: {}".format(repository['repositoryUri'],
+                                                        len(tagged_images) + untagged_count))
+    print("{}: number of untagged images found {}".format(repository['repositoryUri'], untagged_count))
+
+    if len(tagged_images) > 4 * IMAGES_TO_KEEP:
+        # Only the newest IMAGES_TO_KEEP images need to be ordered, everything after them is past the keep count
+        newest_images = heapq.nlargest(IMAGES_TO_KEEP, tagged_images, key=lambda k: k['imagePushedAt'])
+        newest_ids = {id(image) for image in newest_images}
+        tagged_images = newest_images + [image for image in tagged_images if id(image) not in newest_ids]
+    else:
+        tagged_images.sort(key=lambda k: k['imagePushedAt'], reverse=True)
+
+    # Get ImageDigest from ImageURL for running images. Do this for every repository
+    uri = repository['repositoryUri']
+    running_sha_set = set()
 
+    # Calculate abs point to check how old images are. imagePushedAt is tz-aware, so comparing with UTC is safe
+    time_limit = datetime.now(tz=timezone.utc) - IMAGES_KEEP_TIMEDELTA
 
-def append_to_list(image_digest_list, repo_id):
-    if not {'imageDigest': repo_id} in image_digest_list:
-        image_digest_list.append({'imageDigest': repo_id})
+    # Compare bare tags against the running tags of this repository, no URL has to be built per image
+    running_tags_for_repo = running_tags.get(uri, set())
+    for image in tagged_images:
+        if not running_tags_for_repo.isdisjoint(image['imageTags']):
+            running_sha_set.add(image['imageDigest'])
 
+    print("{}: number of running images found {}".format(uri, len(running_sha_set)))
 
-def append_to_tag_list(tag_list, tag_id):
-    if not tag_id in tag_list:
-        tag_list.append(tag_id)
+    for index, image in enumerate(tagged_images):
+        # lastRecordedPullTime is present only for active images.
+        last_activity_time = image.get('lastRecordedPullTime')
+
+        eligible_for_deletion = False
+        # stale image, we will decide based on number or push time
+        if last_activity_time is None:
+            if image['imagePushedAt'] < time_limit or index >= IMAGES_TO_KEEP:
+                eligible_for_deletion = True
+        # active image, only by last pull
+        elif last_activity_time < time_limit:
+            eligible_for_deletion = True
+
+        if eligible_for_deletion:
+            for tag in image['imageTags']:
+                if "latest" not in tag and IGNORE_TAGS_RE.search(tag) is None:
+                    digest = image['imageDigest']
+                    if not running_sha_set or digest not in running_sha_set:
+                        if digest not in seen_sha:
+                            seen_sha.add(digest)
+                            deletesha.append({'imageDigest': digest})
+                        # A tag points to a single image within a repository, so image URLs never repeat
+                        deletetag.append({"imageUrl": f"{uri}:{tag}",
+                                          "pushedAt": image["imagePushedAt"],
+                                          "pulledAt": image.get('lastRecordedPullTime')})
+
+    return deletesha, deletetag, flushed_count
 
 
 def chunks(repo_list, chunk_size):
@@ -207,30 +375,38 @@ def chunks(repo_list, chunk_size):
         yield repo_list[i:i + chunk_size]
 
 
-def delete_images(ecr_client, deletesha, deletetag, repo_id, name):
+def print_block(message):
+    # print() writes the text and the line end separately, a single write keeps concurrent messages from mixing
+    sys.stdout.write(message + "\n")
+
+
+def delete_images(ecr_client, deletesha, deletetag, repo_id, name, first_chunk=1):
+    # Repositories of all regions delete concurrently, so every message is written with a single print
+    # and names its region and repository to keep the output readable
+    region_name = ecr_client.meta.region_name
     if len(deletesha) >= 1:
         ## spliting list of images to delete on chunks with 100 images each
         ## http://docs.aws.amazon.com/AmazonECR/latest/APIReference/API_BatchDeleteImage.html#API_BatchDeleteImage_RequestSyntax
-        i = 0
-        for deletesha_chunk in chunks(deletesha, 100):
-            i += 1
-            if not DRYRUN:
-                delete_response = ecr_client.batch_delete_image(
-                    registryId=repo_id,
-                    repositoryName=name,
-                    imageIds=deletesha_chunk
-                )
-                print(delete_response)
-            else:
-                print("registryId:" + repo_id)
-                print("repositoryName:" + name)
-                print("Deleting {} chank of images".format(i))
-                print("imageIds:", end='')
-                print(deletesha_chunk)
+        if not DRYRUN:
+            # Chunks are independent, send them concurrently over the shared (thread-safe) client
+            with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+                delete_responses = list(executor.map(
+                    lambda deletesha_chunk: ecr_client.batch_delete_image(
+                        registryId=repo_id,
+                        repositoryName=name,
+                        imageIds=deletesha_chunk
+                    ),
+                    chunks(deletesha, DELETE_BATCH_SIZE)))
+            for i, delete_response in enumerate(delete_responses, start=first_chunk):
+                print_block("{} {}: deleted {} chank of images: {}".format(region_name, name, i, delete_response))
+        else:
+            for i, deletesha_chunk in enumerate(chunks(deletesha, DELETE_BATCH_SIZE), start=first_chunk):
+                print_block("region:{}\nregistryId:{}\nrepositoryName:{}\nDeleting {} chank of images\n"
+                            "imageIds:{}".format(region_name, repo_id, name, i, deletesha_chunk))
     if deletetag:
-        print("Image URLs that are marked for deletion:")
-        for ids in deletetag:
-            print("- {} - {} - {}".format(ids["imageUrl"], ids["pushedAt"], ids["pulledAt"]))
+        lines = ["Image URLs in {} that are marked for deletion:".format(region_name)]
+        lines.extend("- {} - {} - {}".format(ids["imageUrl"], ids["pushedAt"], ids["pulledAt"]) for ids in deletetag)
+        print_block("\n".join(lines))
 
 
 # Below is the test harness
@@ -241,8 +417,8 @@ if __name__ == '__main__':
                         action='store', dest='dryrun')
     PARSER.add_argument('-i', '--imagestokeep', help='Number of image tags to keep', default='100', action='store',
                         dest='imagestokeep')
-    PARSER.add_argument('-d', '--imagestokeepduration', help='Duration from last push', default='3m', action='store',
-                        dest='imagestokeepduration')
+    PARSER.add_argument('-d', '--imagestokeepduration', help='Duration from last push: <number>d/w/m/y (m is 30 days)',
+                        default='3m', action='store', dest='imagestokeepduration')
     PARSER.add_argument('-r', '--region', help='ECR/ECS region', action='store', dest='region', required=True)
     PARSER.add_argument('-re', '--ignoretagsregex', help='Regex of tag names to ignore', default="^$", action='store',
                         dest='ignoretagsregex')